@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+One-time conversion of data.csv to data.parquet, run at deploy time.
+The app reads the Parquet copy and only parses the CSV if it cannot write one.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT / 'src'))
+from vehicle_data import build_parquet
+
+def main():
+    """Convert the CSV given on the command line (default: data.csv)"""
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else str(ROOT / 'data.csv')
+    parquet_path = build_parquet(csv_path)
+    print(f"✅ Wrote {parquet_path}")
+
+if __name__ == "__main__":
+    main()
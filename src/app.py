@@ -6,9 +6,12 @@ This script launches Streamlit for the Vehicle Price Estimator.
 FastAPI code is commented out below for future reference.
 """
 
-import os
 import sys
-import subprocess
+from pathlib import Path
+
+# Make the repo root importable so `python src/app.py` and `python -m src.app` both work
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.launcher import launch
 
 # FastAPI imports (commented out for now)
 # from fastapi import FastAPI, HTTPException
@@ -30,46 +33,7 @@ import subprocess
 
 def main():
     """Main entry point for Databricks Apps"""
-    
-    # Get configuration from environment
-    port = int(os.environ.get('PORT', '8080'))
-    host = os.environ.get('HOST', '0.0.0.0')
-    
-    print(f"🚗 Vehicle Price Estimator - Starting Streamlit")
-    print(f"   Host: {host}")
-    print(f"   Port: {port}")
-    print(f"   Working Directory: {os.getcwd()}")
-    
-    # Check if streamlit_main.py exists (should be in parent directory since we're in src/)
-    streamlit_file = os.path.join('..', 'streamlit_main.py')
-    if not os.path.exists(streamlit_file):
-        # Fallback: try current directory
-        streamlit_file = 'streamlit_main.py'
-        if not os.path.exists(streamlit_file):
-            # Try absolute path from working directory
-            streamlit_file = os.path.join(os.getcwd(), 'streamlit_main.py')
-            if not os.path.exists(streamlit_file):
-                print("❌ streamlit_main.py not found!")
-                print(f"   Searched in: {os.path.join('..', 'streamlit_main.py')}")
-                print(f"   Searched in: streamlit_main.py")
-                print(f"   Searched in: {streamlit_file}")
-                sys.exit(1)
-    
-    # Launch Streamlit with proper configuration
-    cmd = [
-        sys.executable, "-m", "streamlit", "run", streamlit_file,
-        f"--server.port={port}",
-        f"--server.address={host}",
-        "--server.headless=true",
-        "--browser.gatherUsageStats=false",
-        "--server.enableCORS=false",
-        "--server.enableXsrfProtection=false"
-    ]
-    
-    print(f"🚀 Launching: {' '.join(cmd)}")
-    
-    # Replace the current process with Streamlit
-    os.execv(sys.executable, cmd)
+    launch()
 
 # FastAPI functions (commented out for now)
 """
@@ -0,0 +1,75 @@
+"""
+Shared Streamlit launcher for the Vehicle Price Estimator.
+Used by both main.py and src/app.py to start Streamlit in-process.
+"""
+
+import os
+import sys
+import importlib
+from functools import lru_cache
+from pathlib import Path
+
+# Heavy modules the Streamlit script needs on its first run
+PREWARM_MODULES = ('numpy', 'pandas', 'pyarrow')
+
+@lru_cache(maxsize=None)
+def _resolve_target(target):
+    """Find the Streamlit script in the working directory or its parent"""
+    cwd = Path.cwd()
+    candidates = [cwd / target, cwd.parent / target]
+    return next((str(path) for path in candidates if path.is_file()), None)
+
+def _prewarm_imports():
+    """Import heavy modules once so the first page load finds them in sys.modules"""
+    for module in PREWARM_MODULES:
+        importlib.import_module(module)
+
+def launch(target='streamlit_main.py'):
+    """Launch Streamlit with configuration taken from PORT/HOST"""
+
+    # Get environment configuration
+    port = int(os.environ.get('PORT', '8080'))
+    host = os.environ.get('HOST', '0.0.0.0')
+
+    print("🚗 Vehicle Price Estimator - Launching Streamlit")
+    print(f"   Host: {host}")
+    print(f"   Port: {port}")
+    print(f"   Working Directory: {os.getcwd()}")
+
+    streamlit_file = _resolve_target(target)
+    if streamlit_file is None:
+        print(f"❌ {target} not found!")
+        print(f"   Searched in: {os.getcwd()} and its parent directory")
+        sys.exit(1)
+
+    print(f"✅ {target} found")
+
+    # Streamlit configuration, keyed the way bootstrap expects CLI flags
+    flag_options = {
+        "server_port": port,
+        "server_address": host,
+        "server_headless": True,
+        "browser_gatherUsageStats": False,
+        "server_enableCORS": False,
+        "server_enableXsrfProtection": False,
+        "server_enableWebsocketCompression": False
+    }
+
+    # Streamlit runs in this interpreter, so these imports are paid here
+    # once instead of on the first user's page load
+    _prewarm_imports()
+
+    print(f"🚀 Launching: {streamlit_file}")
+
+    # Run Streamlit in this interpreter instead of a fresh subprocess
+    try:
+        from streamlit.web import bootstrap
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run(streamlit_file, False, [], flag_options)
+        print("✅ Streamlit exited")
+    except KeyboardInterrupt:
+        print("🛑 Interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
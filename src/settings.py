@@ -1,36 +1,56 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
-import json
+import orjson
+from vehicle_data import BASE_DIR, atomic_replace, data_version, read_vehicle_data
 
-RULES_FILE = os.path.join(os.getcwd(), "rules.json")
+# Rules are saved at the repository root, independent of the working directory
+RULES_FILE = str(BASE_DIR / "rules.json")
 
 # --- Rules Storage ---
 def _load_rules():
     """Load rules from the JSON file."""
     if os.path.exists(RULES_FILE):
         try:
-            with open(RULES_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+            with open(RULES_FILE, 'rb') as f:
+                return orjson.loads(f.read())
+        except (orjson.JSONDecodeError, FileNotFoundError):
             return []
     return []
 
 def _save_rules(rules):
-    """Save rules to the JSON file."""
-    with open(RULES_FILE, 'w') as f:
-        json.dump(rules, f, indent=4)
+    """Save rules to the JSON file, replacing it atomically."""
+    data = orjson.dumps(rules, option=orjson.OPT_INDENT_2)
+
+    def write(tmp_file):
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+
+    atomic_replace(RULES_FILE, write)
 
 def initialize_rules():
     """Initialize session state for rules from file."""
     if 'rules' not in st.session_state:
         st.session_state.rules = _load_rules()
+    if 'next_rule_id' not in st.session_state:
+        st.session_state.next_rule_id = max([rule['id'] for rule in st.session_state.rules], default=0) + 1
+    if 'rules_version' not in st.session_state:
+        st.session_state.rules_version = 0
+
+def _commit_rules(rules):
+    """Store the updated rules, bump the rules version and save them."""
+    st.session_state.rules = rules
+    st.session_state.rules_version += 1
+    _save_rules(rules)
 
 def add_rule(rule_type, deduction_rate, condition=None):
     """Add a new deduction rule."""
+    initialize_rules()
     rules = st.session_state.rules
-    new_id = max([rule['id'] for rule in rules], default=0) + 1
+    new_id = st.session_state.next_rule_id
+    st.session_state.next_rule_id += 1
     new_rule = {
         "id": new_id,
         "rule_type": rule_type,
@@ -39,14 +59,49 @@ def add_rule(rule_type, deduction_rate, condition=None):
         "is_active": True
     }
     rules.append(new_rule)
-    st.session_state.rules = rules
-    _save_rules(rules)
+    _commit_rules(rules)
+
+def _deduction_lookup(active_df):
+    """Summed rates of active rules: (general rate or None, {year: rate}, {make|model: rate})."""
+    if active_df.empty:
+        return None, {}, {}
+    rates = {
+        rule_type: group.groupby('rule_condition')['deduction_rate'].sum().to_dict()
+        for rule_type, group in active_df.groupby('rule_type')
+    }
+    general_rates = rates.get('General', {})
+    # A 0% General rule still applies, so test for presence rather than the rate
+    general_rate = float(general_rates['General']) if 'General' in general_rates else None
+    return general_rate, rates.get('Year', {}), rates.get('Make Model', {})
+
+def _rules_cache():
+    """Return the cached views of the current rules, rebuilt when rules_version changes."""
+    initialize_rules()
+    cache = st.session_state.get('_rules_cache')
+    if cache is None or cache['version'] != st.session_state.rules_version:
+        rules = st.session_state.rules
+        rules_df = pd.DataFrame(rules)
+        active_df = rules_df[rules_df['is_active']].reset_index(drop=True) if rules else rules_df
+        cache = {
+            'version': st.session_state.rules_version,
+            'rules_df': rules_df,
+            'rule_keys': {(rule['rule_type'], rule['rule_condition']) for rule in rules},
+            'deduction_lookup': _deduction_lookup(active_df)
+        }
+        st.session_state._rules_cache = cache
+    return cache
 
 def get_all_rules():
     """Fetch all deduction rules."""
-    if 'rules' not in st.session_state:
-        initialize_rules()
-    return pd.DataFrame(st.session_state.rules)
+    return _rules_cache()['rules_df']
+
+def get_rule_keys():
+    """Fetch the set of (rule_type, rule_condition) pairs of all rules."""
+    return _rules_cache()['rule_keys']
+
+def get_deduction_lookup():
+    """Fetch the active rule rates keyed for constant-time matching."""
+    return _rules_cache()['deduction_lookup']
 
 def update_rule_status(rule_id, is_active):
     """Update the is_active status of a rule."""
@@ -55,17 +110,67 @@ def update_rule_status(rule_id, is_active):
         if rule['id'] == rule_id:
             rule['is_active'] = is_active
             break
-    st.session_state.rules = rules
-    _save_rules(rules)
+    _commit_rules(rules)
 
 def delete_rule(rule_id):
     """Delete a rule."""
     rules = [rule for rule in st.session_state.rules if rule['id'] != rule_id]
-    st.session_state.rules = rules
-    _save_rules(rules)
+    _commit_rules(rules)
+
+def apply_rule_changes(status_updates, deleted_ids):
+    """Apply pending status updates and deletions with a single save."""
+    rules = []
+    for rule in st.session_state.rules:
+        if rule['id'] in deleted_ids:
+            continue
+        if rule['id'] in status_updates:
+            rule['is_active'] = status_updates[rule['id']]
+        rules.append(rule)
+    _commit_rules(rules)
+
+
+# --- Vehicle Lookups ---
+LOOKUP_COLUMNS = ['Lot Year', 'Lot Make', 'Lot Model']
+
+@st.cache_data(show_spinner=False)
+def _load_lookups(path, mtime):
+    """Load sorted years, makes and models per make from the data file.
+
+    ``mtime`` is only part of the cache key, so editing the file invalidates it.
+    """
+    df = read_vehicle_data(path, LOOKUP_COLUMNS)
+    models_by_make = df.dropna(subset=['Lot Model']).groupby('Lot Make', observed=True, sort=False)['Lot Model'].unique()
+    return {
+        "years": tuple(np.unique(df['Lot Year'].dropna().to_numpy(dtype='int16')).tolist()),
+        "makes": tuple(np.sort(df['Lot Make'].cat.categories.to_numpy()).tolist()),
+        "models_by_make": {make: tuple(sorted(models)) for make, models in models_by_make.items()}
+    }
+
+def get_vehicle_lookups():
+    """Fetch the cached vehicle lookups, reloading them when data.csv changes."""
+    return _load_lookups(*data_version())
 
 
 # --- UI Components ---
+def _handle_rules_edit(editor_key, rule_ids):
+    """Apply toggles and deletions made in the rules editor.
+
+    Runs as the editor's on_change callback, so no explicit rerun is needed.
+    """
+    edited_rows = st.session_state[editor_key].get('edited_rows', {})
+    status_updates = {
+        rule_ids[int(row)]: bool(values['is_active'])
+        for row, values in edited_rows.items()
+        if 'is_active' in values
+    }
+    deleted_ids = {
+        rule_ids[int(row)]
+        for row, values in edited_rows.items()
+        if values.get('delete')
+    }
+    if status_updates or deleted_ids:
+        apply_rule_changes(status_updates, deleted_ids)
+
 def settings_page():
     """Renders the Deduction Rules settings page."""
     st.header("Deduction Rules")
@@ -87,10 +192,8 @@ def settings_page():
 
     elif rule_type == "Year":
         try:
-            data_path = os.path.join(os.getcwd(), 'data.csv')
-            df = pd.read_csv(data_path)
-            years = sorted(df['Lot Year'].dropna().unique())
-            selected_year = st.selectbox("Select Year", years)
+            lookups = get_vehicle_lookups()
+            selected_year = st.selectbox("Select Year", lookups["years"])
             deduction_value = st.number_input("Deduction (%)", min_value=0.0, max_value=100.0, step=0.1, format="%.1f")
             condition = str(selected_year)
         except FileNotFoundError:
@@ -100,12 +203,10 @@ def settings_page():
 
     elif rule_type == "Make Model":
         try:
-            data_path = os.path.join(os.getcwd(), 'data.csv')
-            df = pd.read_csv(data_path)
-            makes = sorted(df['Lot Make'].dropna().unique())
-            selected_make = st.selectbox("Select Make", makes)
+            lookups = get_vehicle_lookups()
+            selected_make = st.selectbox("Select Make", lookups["makes"])
 
-            models = sorted(df[df['Lot Make'] == selected_make]['Lot Model'].dropna().unique())
+            models = lookups["models_by_make"].get(selected_make, ())
             selected_model = st.selectbox("Select Model", models)
 
             deduction_value = st.number_input("Deduction (%)", min_value=0.0, max_value=100.0, step=0.1, format="%.1f")
@@ -116,28 +217,19 @@ def settings_page():
 
     if st.button("Add Deduction Rule"):
         if deduction_value is not None:
-            rules_df = get_all_rules()
-            duplicate_found = False
+            duplicate_found = (rule_type, condition) in get_rule_keys()
 
-            if rule_type == "General":
-                if 'General' in rules_df[rules_df['rule_type'] == 'General']['rule_condition'].values:
+            if duplicate_found:
+                if rule_type == "General":
                     st.toast("General deduction rule already exists. Please delete it to add a new one.", icon="⚠️")
-                    duplicate_found = True
-
-            elif rule_type == "Year":
-                if condition in rules_df[rules_df['rule_type'] == 'Year']['rule_condition'].values:
+                elif rule_type == "Year":
                     st.toast(f"Deduction rule for year {condition} already exists.", icon="⚠️")
-                    duplicate_found = True
-
-            elif rule_type == "Make Model":
-                if condition in rules_df[rules_df['rule_type'] == 'Make Model']['rule_condition'].values:
+                elif rule_type == "Make Model":
                     st.toast(f"Deduction rule for {condition.replace('|', ' ')} already exists.", icon="⚠️")
-                    duplicate_found = True
 
             if not duplicate_found:
                 add_rule(rule_type, deduction_value, condition)
                 st.success("Deduction rule added successfully!")
-                st.rerun()
         else:
             st.warning("Please fill in all the details.")
 
@@ -146,23 +238,25 @@ def settings_page():
 
     rules_df = get_all_rules()
     if not rules_df.empty:
-        for index, row in rules_df.iterrows():
-            col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-            with col1:
-                st.write(f"**Rule Type:** {row['rule_type']}")
-                if row['rule_condition']:
-                    st.write(f"**Condition:** {row['rule_condition']}")
-            with col2:
-                st.write(f"**Deduction Rate:** {row['deduction_rate']}%")
-            with col3:
-                is_active = st.toggle("Active", value=row['is_active'], key=f"active_{row['id']}")
-                if is_active != row['is_active']:
-                    update_rule_status(row['id'], is_active)
-                    st.rerun()
-            with col4:
-                if st.button("Delete", key=f"delete_{row['id']}"):
-                    delete_rule(row['id'])
-                    st.rerun()
-            st.markdown("---")
+        editor_key = f"rules_editor_{st.session_state.rules_version}"
+        # New rules go through the form above; the editor only toggles and deletes
+        st.data_editor(
+            rules_df.assign(delete=False),
+            column_config={
+                "id": None,
+                "rule_type": st.column_config.TextColumn("Rule Type"),
+                "rule_condition": st.column_config.TextColumn("Condition"),
+                "deduction_rate": st.column_config.NumberColumn("Deduction Rate", format="%.1f%%"),
+                "is_active": st.column_config.CheckboxColumn("Active"),
+                "delete": st.column_config.CheckboxColumn("Delete")
+            },
+            disabled=["rule_type", "rule_condition", "deduction_rate"],
+            hide_index=True,
+            num_rows="fixed",
+            use_container_width=True,
+            key=editor_key,
+            on_change=_handle_rules_edit,
+            args=(editor_key, rules_df['id'].tolist())
+        )
     else:
         st.info("There are no existing rules.")
@@ -0,0 +1,121 @@
+"""
+Vehicle sales data loading shared by the Streamlit pages.
+data.csv is served from a Parquet copy next to it whenever possible.
+"""
+
+import os
+import glob
+import stat
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Columns read from data.csv and their dtypes; nothing else is used
+USECOLS = ["VIN", "Lot Year", "Lot Make", "Lot Model", "Sale Price",
+           "Lot Run Condition", "Sale Title Type", "Damage Type Description",
+           "Odometer Reading", "Lot Fuel Type"]
+DTYPES = {
+    "VIN": "string",
+    "Lot Year": "Int32",
+    "Lot Make": "category",
+    "Lot Model": "category",
+    "Sale Price": "float32",
+    "Lot Run Condition": "category",
+    "Sale Title Type": "category",
+    "Damage Type Description": "category",
+    "Odometer Reading": "Int32",
+    "Lot Fuel Type": "category"
+}
+
+# Repository root; data files are resolved against it, not the cwd
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+@lru_cache(maxsize=None)
+def resolve_path(rel):
+    """Locate a file once per process, supporting both local and Databricks file paths"""
+    local_path = BASE_DIR / rel
+    if local_path.exists():
+        return str(local_path)
+    # Try alternative path for Databricks
+    matching_files = glob.glob(os.path.join('/Workspace/Repos/*', rel))
+    return matching_files[0] if matching_files else rel
+
+def data_version():
+    """Resolved data.csv path and its mtime, the cache key for everything derived from it"""
+    data_path = resolve_path('data.csv')
+    return data_path, os.path.getmtime(data_path)
+
+def _file_mode(path):
+    """Permission bits of an existing file, or the umask default for a new one."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def atomic_replace(path, write):
+    """Replace ``path`` with the file ``write(tmp_path)`` creates, keeping its permissions.
+
+    The temp file has a unique name next to ``path``, so concurrent writers never
+    share it and readers only ever see the old or the new file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        # mkstemp creates the file as 0600; keep the mode the target already has
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def parquet_path_for(csv_path):
+    """Path of the Parquet copy of a CSV data file."""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+def _read_csv(csv_path, columns=USECOLS):
+    """Parse only the requested columns of the CSV with their known dtypes."""
+    dtypes = {col: DTYPES[col] for col in columns}
+    return pd.read_csv(csv_path, usecols=columns, dtype=dtypes, engine='c')
+
+def build_parquet(csv_path):
+    """Convert the used columns of the CSV to a zstd-compressed Parquet file."""
+    parquet_path = parquet_path_for(csv_path)
+    df = _read_csv(csv_path)
+    atomic_replace(parquet_path, lambda tmp_path: df.to_parquet(
+        tmp_path, engine='pyarrow', compression='zstd', index=False))
+    return parquet_path
+
+def _parquet_is_current(csv_path, parquet_path):
+    """Check that the Parquet copy is readable, newer than the CSV and has every column."""
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        return False
+    try:
+        return set(USECOLS).issubset(pq.read_schema(parquet_path).names)
+    except pa.ArrowInvalid:
+        return False
+
+def ensure_parquet(csv_path):
+    """Build the Parquet copy if it is missing or out of date."""
+    parquet_path = parquet_path_for(csv_path)
+    if not _parquet_is_current(csv_path, parquet_path):
+        build_parquet(csv_path)
+    return parquet_path
+
+def read_vehicle_data(csv_path, columns=USECOLS):
+    """Load the requested columns, preferring the Parquet copy over the CSV."""
+    try:
+        parquet_path = ensure_parquet(csv_path)
+        try:
+            return pd.read_parquet(parquet_path, columns=list(columns), engine='pyarrow')
+        except pa.ArrowInvalid:
+            # Unreadable copy despite a valid footer: rebuild it from the CSV
+            return pd.read_parquet(build_parquet(csv_path), columns=list(columns), engine='pyarrow')
+    except OSError:
+        # Read-only directory: parse the CSV directly
+        return _read_csv(csv_path, columns)
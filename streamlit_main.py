@@ -6,16 +6,19 @@ This version runs only Streamlit with embedded API functionality.
 
 import streamlit as st
 import pandas as pd
-import os
+import numpy as np
+import pyarrow as pa
 import sys
-import joblib
-import glob
-import time
 
-# Add src to path for imports
-sys.path.append('src')
-from model_inference import predict_price
-from settings import settings_page, get_all_rules, initialize_rules
+# Add src to path for imports (once; this script re-runs on every interaction)
+if 'src' not in sys.path:
+    sys.path.append('src')
+from settings import settings_page, get_deduction_lookup
+from vehicle_data import USECOLS, data_version, read_vehicle_data
+
+# Categorical features offered as dropdowns on the manual input page
+CATEGORICAL_COLS = ('Lot Make', 'Lot Model', 'Lot Run Condition',
+                    'Sale Title Type', 'Damage Type Description', 'Lot Fuel Type')
 
 # Page configuration
 st.set_page_config(
@@ -24,52 +27,44 @@ st.set_page_config(
     layout="wide"
 )
 
-def load_preprocessor():
-    """Load the preprocessor to get feature names and categories"""
-    try:
-        # Support both local and Databricks file paths
-        preprocessor_path = os.path.join(os.getcwd(), 'pkl_files', 'preprocessor_v1.pkl')
-        if not os.path.exists(preprocessor_path):
-            # Try alternative path for Databricks
-            preprocessor_path = '/Workspace/Repos/*/pkl_files/preprocessor_v1.pkl'
-            matching_files = glob.glob(preprocessor_path)
-            if matching_files:
-                preprocessor_path = matching_files[0]
-            else:
-                preprocessor_path = 'pkl_files/preprocessor_v1.pkl'
-        
-        preprocessor = joblib.load(preprocessor_path)
-        return preprocessor
-    except Exception as e:
-        st.error(f"Error loading preprocessor: {e}")
-        return None
+@st.cache_data(show_spinner=False)
+def _read_data(path, mtime):
+    """Load the data file; ``mtime`` keys the cache so file edits invalidate it"""
+    return read_vehicle_data(path)
+
+@st.cache_resource(show_spinner=False)
+def _search_data(path, mtime):
+    """Data frame with every text column stripped once, used for VIN search. Read-only."""
+    data = _read_data(path, mtime)
+    # Arrow-backed strings run strip/slice/compare in C kernels
+    data['VIN'] = data['VIN'].astype('string[pyarrow]')
+    for col in data.select_dtypes(include=['object', 'string', 'category']).columns:
+        stripped = data[col].str.strip()
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            stripped = stripped.astype('category')
+        data[col] = stripped
+    return data
+
+@st.cache_resource(show_spinner=False)
+def _vin_prefix_index(path, mtime):
+    """Map each 8-character VIN prefix to the row positions that share it"""
+    data = _search_data(path, mtime)
+    return data.groupby(data['VIN'].str.slice(0, 8)).indices
+
+@st.cache_data(show_spinner=False)
+def _unique_values(path, mtime):
+    """Sorted unique values of each categorical column, cached per data file version"""
+    data = _read_data(path, mtime)
+    return {
+        # Columns are categorical, so their unique values are the (never-NaN) categories
+        col: sorted(data[col].cat.categories.tolist())
+        for col in CATEGORICAL_COLS if col in data.columns
+    }
 
 def get_unique_values_from_data():
     """Get unique values for categorical features from the data.csv file"""
     try:
-        # Support both local and Databricks file paths
-        data_path = os.path.join(os.getcwd(), 'data.csv')
-        if not os.path.exists(data_path):
-            # Try alternative path for Databricks
-            data_path = '/Workspace/Repos/*/data.csv'
-            matching_files = glob.glob(data_path)
-            if matching_files:
-                data_path = matching_files[0]
-            else:
-                data_path = 'data.csv'
-        
-        data = pd.read_csv(data_path)
-        unique_values = {}
-        
-        # Get unique values for categorical columns
-        categorical_cols = ['Lot Make', 'Lot Model', 'Lot Run Condition', 
-                          'Sale Title Type', 'Damage Type Description', 'Lot Fuel Type']
-        
-        for col in categorical_cols:
-            if col in data.columns:
-                unique_values[col] = sorted(data[col].dropna().unique().tolist())
-        
-        return unique_values
+        return _unique_values(*data_version())
     except Exception as e:
         st.error(f"Error loading data for dropdowns: {e}")
         return {}
@@ -77,33 +72,13 @@ def get_unique_values_from_data():
 def get_vin_data(vin: str):
     """Get VIN data directly without API call"""
     try:
-        # Support both local and Databricks file paths
-        data_path = os.path.join(os.getcwd(), 'data.csv')
-        if not os.path.exists(data_path):
-            data_path = '/Workspace/Repos/*/data.csv'
-            matching_files = glob.glob(data_path)
-            if matching_files:
-                data_path = matching_files[0]
-            else:
-                data_path = 'data.csv'
-        
-        data = pd.read_csv(data_path)
+        version = data_version()
+        rows = _vin_prefix_index(*version).get(vin[:8])
         
-        vin_search = vin[:8]
-        str_cols = data.select_dtypes(include=['object', 'string']).columns
-        data[str_cols] = data[str_cols].apply(lambda x: x.str.strip())
-        
-        data_cleaned = data[data['VIN'].str.strip().str[:8] == vin_search].copy()
-        
-        if data_cleaned.empty:
+        if rows is None:
             return pd.DataFrame()
         
-        cols = [
-            "VIN", "Lot Year", "Lot Make", "Lot Model", "Sale Price",
-            "Lot Run Condition", "Sale Title Type", "Damage Type Description",
-            "Odometer Reading", "Lot Fuel Type"
-        ]
-        return data_cleaned[cols].reset_index(drop=True)
+        return _search_data(*version).iloc[rows][USECOLS].reset_index(drop=True)
     except Exception as e:
         st.error(f"Error loading VIN data: {e}")
         return pd.DataFrame()
@@ -113,18 +88,41 @@ def estimate_price_by_vin(df_similar: pd.DataFrame):
     if df_similar.empty:
         return None
     
-    Q1 = df_similar['Sale Price'].quantile(0.25)
-    Q3 = df_similar['Sale Price'].quantile(0.75)
+    prices = df_similar['Sale Price'].dropna().to_numpy(dtype=np.float32)
+    if prices.size == 0:
+        return None
+    
+    # Both quartiles from a single percentile pass over the raw array
+    Q1, Q3 = np.percentile(prices, [25, 75])
     IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
+    cleaned = prices[(prices >= Q1 - 1.5 * IQR) & (prices <= Q3 + 1.5 * IQR)]
+    
+    if cleaned.size == 0:
+        return float(np.median(prices))
     
-    df_cleaned = df_similar[(df_similar['Sale Price'] >= lower) & (df_similar['Sale Price'] <= upper)]
+    return float(np.median(cleaned))
+
+def apply_deductions(deduction_lookup, vehicle_year, vehicle_make, vehicle_model):
+    """Total rate and descriptions of the deduction rules that match a vehicle"""
+    general_rate, year_rates, make_model_rates = deduction_lookup
+    total_deduction_rate = 0.0
+    applicable_rules = []
     
-    if df_cleaned.empty:
-        return float(df_similar['Sale Price'].median())
+    if general_rate is not None:
+        total_deduction_rate += general_rate
+        applicable_rules.append(f"General Deduction: {general_rate}%")
+    if year_rates:
+        year = str(int(vehicle_year))
+        if year in year_rates:
+            total_deduction_rate += year_rates[year]
+            applicable_rules.append(f"Year-Based ({year}): {year_rates[year]}%")
+    if make_model_rates:
+        make_model = f"{vehicle_make}|{vehicle_model}"
+        if make_model in make_model_rates:
+            total_deduction_rate += make_model_rates[make_model]
+            applicable_rules.append(f"Make/Model-Based ({make_model.replace('|', ' ')}): {make_model_rates[make_model]}%")
     
-    return float(df_cleaned['Sale Price'].median())
+    return float(total_deduction_rate), applicable_rules
 
 def main():
     st.sidebar.title("Navigation")
@@ -152,6 +150,8 @@ def vin_based_prediction():
     try:
         if 'similar_vehicles' not in st.session_state:
             st.session_state.similar_vehicles = None
+        if 'similar_table' not in st.session_state:
+            st.session_state.similar_table = None
         if 'vin_searched' not in st.session_state:
             st.session_state.vin_searched = None
     except Exception:
@@ -163,23 +163,25 @@ def vin_based_prediction():
     
     # Search button
     if st.button("Search Similar Vehicles", type="primary"):
-        time.sleep(3)
         if vin:
             with st.spinner("Searching for similar vehicles..."):
                 # Get VIN data directly
                 similar_df = get_vin_data(vin)
                 
                 if not similar_df.empty:
-                    similar_vehicles = similar_df.to_dict(orient="records")
                     try:
-                        st.session_state.similar_vehicles = similar_vehicles
+                        # Keep the DataFrame itself; no records round-trip
+                        st.session_state.similar_vehicles = similar_df
+                        # Arrow copy for display, converted once per search
+                        st.session_state.similar_table = pa.Table.from_pandas(similar_df, preserve_index=False)
                         st.session_state.vin_searched = vin
                     except Exception:
                         pass  # Fallback for session state issues
-                    st.success(f"Found {len(similar_vehicles)} similar vehicles!")
+                    st.success(f"Found {len(similar_df)} similar vehicles!")
                 else:
                     try:
                         st.session_state.similar_vehicles = None
+                        st.session_state.similar_table = None
                         st.session_state.vin_searched = None
                     except Exception:
                         pass  # Fallback for session state issues
@@ -189,15 +191,15 @@ def vin_based_prediction():
     
     # Display results if we have similar vehicles
     try:
-        similar_vehicles = getattr(st.session_state, 'similar_vehicles', None)
+        df_similar = getattr(st.session_state, 'similar_vehicles', None)
+        similar_table = getattr(st.session_state, 'similar_table', None)
     except Exception:
-        similar_vehicles = None
+        df_similar = similar_table = None
     
-    if similar_vehicles:
+    if df_similar is not None:
         st.subheader("Similar Vehicles Found:")
-        df_similar = pd.DataFrame(similar_vehicles)
         st.dataframe(
-            df_similar,
+            similar_table if similar_table is not None else df_similar,
             column_config={
                 "Lot Year": st.column_config.NumberColumn(format="%d")
             },
@@ -207,8 +209,6 @@ def vin_based_prediction():
         # Prediction button
         if st.button("Predict Price", type="secondary"):
             with st.spinner("Calculating price prediction..."):
-                # Add 3-second delay for demonstration
-                time.sleep(3)
                 # Calculate prediction directly
                 estimated_price = estimate_price_by_vin(df_similar)
                 
@@ -218,35 +218,13 @@ def vin_based_prediction():
                     col1, col2 = st.columns(2)
                     with col1:
                         # --- Deduction Rules Application ---
-                        initialize_rules()
-                        all_rules = get_all_rules()
-                        active_rules = all_rules[all_rules['is_active']]
+                        vehicle_year = df_similar['Lot Year'].iat[0]
+                        vehicle_make = df_similar['Lot Make'].iat[0]
+                        vehicle_model = df_similar['Lot Model'].iat[0]
 
-                        total_deduction_rate = 0.0
-                        applicable_rules = []
-                        if not active_rules.empty:
-                            vehicle_year = df_similar['Lot Year'].iloc[0]
-                            vehicle_make = df_similar['Lot Make'].iloc[0]
-                            vehicle_model = df_similar['Lot Model'].iloc[0]
-
-                            for _, rule in active_rules.iterrows():
-                                applied = False
-                                rule_desc = ""
-                                if rule['rule_type'] == 'General' and rule['rule_condition'] == 'General':
-                                    applied = True
-                                    rule_desc = f"General Deduction: {rule['deduction_rate']}%"
-                                elif rule['rule_type'] == 'Year':
-                                    if str(int(vehicle_year)) == rule['rule_condition']:
-                                        applied = True
-                                        rule_desc = f"Year-Based ({rule['rule_condition']}): {rule['deduction_rate']}%"
-                                elif rule['rule_type'] == 'Make Model':
-                                    if f"{vehicle_make}|{vehicle_model}" == rule['rule_condition']:
-                                        applied = True
-                                        rule_desc = f"Make/Model-Based ({rule['rule_condition'].replace('|', ' ')}): {rule['deduction_rate']}%"
-                                
-                                if applied:
-                                    total_deduction_rate += rule['deduction_rate']
-                                    applicable_rules.append(rule_desc)
+                        total_deduction_rate, applicable_rules = apply_deductions(
+                            get_deduction_lookup(), vehicle_year, vehicle_make, vehicle_model
+                        )
 
                         final_price = estimated_price * (1 - total_deduction_rate / 100)
 
@@ -271,14 +249,20 @@ def vin_based_prediction():
                     # Show price distribution
                     if 'Sale Price' in df_similar.columns:
                         st.subheader("Price Distribution of Similar Vehicles")
-                        st.bar_chart(df_similar['Sale Price'])
+                        # Bin server-side so the chart payload stays constant-size
+                        prices = df_similar['Sale Price'].dropna().to_numpy(dtype=np.float64)
+                        if prices.size:
+                            # Never more bins than distinct prices, so one or a few prices still chart
+                            counts, edges = np.histogram(prices, bins=min(30, np.unique(prices).size))
+                            # Unrounded left edges stay unique even for tightly grouped prices
+                            chart_df = pd.DataFrame({"Sale Price": edges[:-1], "Vehicles": counts})
+                            st.bar_chart(chart_df.set_index("Sale Price"))
 
 def manual_input_prediction():
     st.header("Manual Input Price Prediction")
     st.markdown("Enter vehicle details manually to get a price prediction using our ML model.")
     
-    # Load preprocessor and unique values
-    preprocessor = load_preprocessor()
+    # Load unique values for the dropdowns
     unique_values = get_unique_values_from_data()
     
     if not unique_values:
@@ -321,6 +305,9 @@ def manual_input_prediction():
             }
             
             with st.spinner("Making prediction..."):
+                # Imported here so VIN-only sessions never load the model code
+                from model_inference import predict_price
+                
                 # Call the ML model directly
                 prediction_result = predict_price(input_data)
                 
@@ -335,37 +322,12 @@ def manual_input_prediction():
                     col1, col2, col3 = st.columns(3)
                     with col1:
                         # --- Deduction Rules Application ---
-                        initialize_rules()
-                        all_rules = get_all_rules()
-                        active_rules = all_rules[all_rules['is_active']]
-
-                        total_deduction_rate = 0.0
-                        applicable_rules = []
                         estimated_price = prediction_result['predicted_sale_price']
 
-                        if not active_rules.empty:
-                            vehicle_year = input_data['Lot Year']
-                            vehicle_make = input_data['Lot Make']
-                            vehicle_model = input_data['Lot Model']
-
-                            for _, rule in active_rules.iterrows():
-                                applied = False
-                                rule_desc = ""
-                                if rule['rule_type'] == 'General' and rule['rule_condition'] == 'General':
-                                    applied = True
-                                    rule_desc = f"General Deduction: {rule['deduction_rate']}%"
-                                elif rule['rule_type'] == 'Year':
-                                    if str(int(vehicle_year)) == rule['rule_condition']:
-                                        applied = True
-                                        rule_desc = f"Year-Based ({rule['rule_condition']}): {rule['deduction_rate']}%"
-                                elif rule['rule_type'] == 'Make Model':
-                                    if f"{vehicle_make}|{vehicle_model}" == rule['rule_condition']:
-                                        applied = True
-                                        rule_desc = f"Make/Model-Based ({rule['rule_condition'].replace('|', ' ')}): {rule['deduction_rate']}%"
-                                
-                                if applied:
-                                    total_deduction_rate += rule['deduction_rate']
-                                    applicable_rules.append(rule_desc)
+                        total_deduction_rate, applicable_rules = apply_deductions(
+                            get_deduction_lookup(), input_data['Lot Year'],
+                            input_data['Lot Make'], input_data['Lot Model']
+                        )
 
                         final_price = estimated_price * (1 - total_deduction_rate / 100)
 